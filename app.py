@@ -1,187 +1,355 @@
-import streamlit as st
-import pandas as pd
-import plotly.graph_objects as go
-import plotly.figure_factory as ff
-from datetime import datetime, date
-import base64
-import requests
-
-# --------------------
-# GitHub Info
-# --------------------
-GITHUB_TOKEN = st.secrets["GITHUB_TOKEN"]
-REPO_OWNER = st.secrets["REPO_OWNER"]
-REPO_NAME = st.secrets["REPO_NAME"]
-FILE_PATH = st.secrets["FILE_PATH"]
-BRANCH = st.secrets["BRANCH"]
-
-CSV_FILE = "daily_log.csv"
-
-COLUMNS = [
-    "Date", "Weekday", "Ordinary Day", "Screen Time", "Study Time", "Study Quality (1-10)",
-    "Meditation", "Morning Study", "Morning Phone", "Lunch Phone", "Dinner Phone", 
-    "Running", "P", "Morning Wake Up Hour", "Notes", "Plan/Strategies"
-]
-
-def hhmm_to_decimal(val):
-    try:
-        if isinstance(val, str) and ':' in val:
-            h, m = map(int, val.split(':'))
-            return round(h + m / 60, 2)
-        return float(val)
-    except:
-        return val
-
-# --------------------
-# GitHub API helpers
-# --------------------
-def get_file_sha():
-    url = f"https://api.github.com/repos/{REPO_OWNER}/{REPO_NAME}/contents/{FILE_PATH}"
-    headers = {"Authorization": f"token {GITHUB_TOKEN}"}
-    resp = requests.get(url, headers=headers)
-    if resp.status_code == 200:
-        return resp.json()["sha"]
-    return None
-
-def upload_to_github(df, commit_message="Update daily_log.csv"):
-    csv_string = df.to_csv(index=False)
-    content_encoded = base64.b64encode(csv_string.encode()).decode()
-    sha = get_file_sha()
-    if not sha:
-        st.error("❌ Failed to fetch SHA from GitHub.")
-        return False
-
-    url = f"https://api.github.com/repos/{REPO_OWNER}/{REPO_NAME}/contents/{FILE_PATH}"
-    headers = {"Authorization": f"token {GITHUB_TOKEN}"}
-    data = {
-        "message": commit_message,
-        "content": content_encoded,
-        "sha": sha,
-        "branch": BRANCH
-    }
-    response = requests.put(url, headers=headers, json=data)
-    return response.status_code in [200, 201]
-
-def load_data():
-    url = f"https://raw.githubusercontent.com/{REPO_OWNER}/{REPO_NAME}/{BRANCH}/{FILE_PATH}"
-    try:
-        df = pd.read_csv(url)
-        df["Date"] = pd.to_datetime(df["Date"])
-        if "Morning Wake Up Hour" in df.columns:
-            df["Morning Wake Up Hour"] = df["Morning Wake Up Hour"].apply(hhmm_to_decimal)
-        return df
-    except Exception:
-        return pd.DataFrame(columns=COLUMNS)
-
-# --------------------
-# Init session state
-# --------------------
-if "df" not in st.session_state:
-    st.session_state.df = load_data()
-
-# --------------------
-# UI
-# --------------------
-st.set_page_config(page_title="Daily Log", layout="wide")
-st.title("📊 Daily Log Tracker")
-
-st.subheader("📝 Add New Entry")
-
-with st.form("log_form", clear_on_submit=True):
-    entry_date = st.date_input("Date", value=date.today())
-    
-    # Time inputs
-    screen_time_t = st.time_input("Screen Time (HH:MM)", value=datetime.strptime("00:00", "%H:%M").time())
-    study_time_t = st.time_input("Study Time (HH:MM)", value=datetime.strptime("00:00", "%H:%M").time())
-    wakeup_time = st.time_input("Morning Wake Up Hour", value=datetime.strptime("08:00", "%H:%M").time())
-
-    def time_to_decimal(t):
-        return round(t.hour + t.minute / 60, 2)
-
-    screen_time = time_to_decimal(screen_time_t)
-    study_time = time_to_decimal(study_time_t)
-    wakeup_decimal = time_to_decimal(wakeup_time)
-
-    entry = {
-        "Date": pd.to_datetime(entry_date),
-        "Weekday": pd.to_datetime(entry_date).strftime("%A"),
-        "Ordinary Day": st.selectbox("Ordinary Day", ["Yes", "No"]),
-        "Screen Time": screen_time,
-        "Study Time": study_time,
-        "Study Quality (1-10)": st.slider("Study Quality", 1, 10),
-        "Meditation": st.selectbox("Meditation", ["Yes", "No"]),
-        "Morning Study": st.selectbox("Morning Study", ["Yes", "No"]),
-        "Morning Phone": st.selectbox("Morning Phone", ["Yes", "No"]),
-        "Lunch Phone": st.selectbox("Lunch Phone", ["Yes", "No"]),
-        "Dinner Phone": st.selectbox("Dinner Phone", ["Yes", "No"]),
-        "Running": st.selectbox("Running", ["Yes", "No"]),
-        "P": st.selectbox("P", ["Yes", "No"]),
-        "Morning Wake Up Hour": wakeup_decimal,
-        "Notes": st.text_area("Notes"),
-        "Plan/Strategies": st.text_area("Plan/Strategies")
-    }
-
-    submitted = st.form_submit_button("Add Entry")
-
-if submitted:
-    new_row = pd.DataFrame([entry])
-    # Update session dataframe immediately
-    st.session_state.df = pd.concat([st.session_state.df, new_row], ignore_index=True)
-
-    # Push to GitHub
-    if upload_to_github(st.session_state.df):
-        st.success(f"✅ Entry for {entry['Date'].date()} saved to GitHub!")
-
-# --------------------
-# Analysis + Plots
-# --------------------
-df = st.session_state.df
-
-# Date filter
-col1, col2 = st.columns(2)
-with col1:
-    start_date = st.date_input("Start Date", df["Date"].min() if not df.empty else date.today())
-with col2:
-    end_date = st.date_input("End Date", df["Date"].max() if not df.empty else date.today())
-
-filtered_df = df[(df["Date"] >= pd.to_datetime(start_date)) & (df["Date"] <= pd.to_datetime(end_date))]
-
-# Recent Logs
-st.subheader("🕒 Recent Logs")
-if not df.empty:
-    st.dataframe(df.sort_values("Date", ascending=False).head(3), use_container_width=True)
-else:
-    st.info("No entries yet!")
-
-# Line Charts
-if not filtered_df.empty:
-    st.subheader("📈 Time-Based Charts")
-    with col1:
-        fig1 = go.Figure()
-        fig1.add_trace(go.Scatter(x=filtered_df["Date"], y=filtered_df["Screen Time"], mode='lines+markers'))
-        fig1.update_layout(title="Screen Time", xaxis_title="Date", yaxis_title="Hours")
-        st.plotly_chart(fig1, use_container_width=True)
-
-    with col2:
-        fig2 = go.Figure()
-        fig2.add_trace(go.Scatter(x=filtered_df["Date"], y=filtered_df["Study Time"], mode='lines+markers'))
-        fig2.update_layout(title="Study Time", xaxis_title="Date", yaxis_title="Hours")
-        st.plotly_chart(fig2, use_container_width=True)
-
-# Correlation Heatmap
-if len(filtered_df) > 1:
-    st.subheader("🔍 Correlation Heatmap")
-    numeric_df = filtered_df.select_dtypes(include='number')
-    if not numeric_df.empty:
-        corr = numeric_df.corr()
-        heatmap = ff.create_annotated_heatmap(
-            z=corr.values,
-            x=list(corr.columns),
-            y=list(corr.index),
-            colorscale='RdBu',
-            showscale=True
-        )
-        heatmap.update_layout(title="Numerical Correlation Heatmap")
-        st.plotly_chart(heatmap, use_container_width=True)
-    else:
-        st.info("No numeric data to show correlation.")
+import streamlit as st
+import pandas as pd
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, date
+import base64
+import io
+import requests
+
+# --------------------
+# GitHub Info
+# --------------------
+GITHUB_TOKEN = st.secrets["GITHUB_TOKEN"]
+REPO_OWNER = st.secrets["REPO_OWNER"]
+REPO_NAME = st.secrets["REPO_NAME"]
+FILE_PATH = st.secrets["FILE_PATH"]
+BRANCH = st.secrets["BRANCH"]
+
+@st.cache_resource(show_spinner=False)
+def get_github_session():
+    # Shared across reruns so GitHub calls reuse one keep-alive connection
+    session = requests.Session()
+    session.headers.update({
+        "Authorization": f"token {GITHUB_TOKEN}",
+        "Accept": "application/vnd.github+json",
+    })
+    return session
+
+SESSION = get_github_session()
+
+# Entries are buffered in the session and pushed to GitHub in one upload
+# once this many are pending (or when the user hits Sync).
+SYNC_THRESHOLD = 10
+
+COLUMNS = [
+    "Date", "Ordinary Day", "Screen Time", "Study Time", "Study Quality (1-10)",
+    "Meditation", "Morning Study", "Morning Phone", "Lunch Phone", "Dinner Phone", 
+    "Running", "P", "Morning Wake Up Hour", "Notes", "Plan/Strategies"
+]
+
+YES_NO = ("Yes", "No")
+
+YES_NO_COLUMNS = [
+    "Ordinary Day", "Meditation", "Morning Study", "Morning Phone",
+    "Lunch Phone", "Dinner Phone", "Running", "P"
+]
+
+HOUR_COLUMNS = ["Screen Time", "Study Time", "Morning Wake Up Hour"]
+
+def apply_dtypes(df):
+    """Narrow numeric columns to float32 hours and int8 flags/scores."""
+    for c in HOUR_COLUMNS:
+        if c in df.columns:
+            df[c] = pd.to_numeric(df[c], errors="coerce").astype(np.float32)
+    for c in YES_NO_COLUMNS + ["Study Quality (1-10)"]:
+        # int8 has no NaN, so leave a column with gaps as it is
+        if c in df.columns and not df[c].isna().any():
+            df[c] = df[c].astype(np.int8)
+    return df
+
+def hhmm_to_decimal(col):
+    """Convert a column of "HH:MM" strings and plain numbers to decimal hours."""
+    col = col.astype(str)
+    mask = col.str.contains(":", na=False)
+    out = pd.to_numeric(col.where(~mask), errors="coerce")
+    if mask.any():
+        parts = col[mask].str.split(":", expand=True)
+        hours = pd.to_numeric(parts[0], errors="coerce")
+        minutes = pd.to_numeric(parts[1], errors="coerce")
+        out.loc[mask] = (hours + minutes / 60).round(2)
+    return out.astype(np.float32)
+
+# --------------------
+# Log file format
+# --------------------
+# A FILE_PATH ending in .parquet stores the log as typed, compressed Parquet;
+# anything else is treated as CSV.
+USE_PARQUET = FILE_PATH.endswith(".parquet")
+
+def read_log(content):
+    """Parse the raw bytes of the log file into a DataFrame."""
+    if USE_PARQUET:
+        # Parquet keeps the dtypes we wrote, so no clean-up is needed
+        return pd.read_parquet(io.BytesIO(content))
+    df = pd.read_csv(io.BytesIO(content), parse_dates=["Date"], date_format="%Y-%m-%d")
+    if "Morning Wake Up Hour" in df.columns:
+        df["Morning Wake Up Hour"] = hhmm_to_decimal(df["Morning Wake Up Hour"])
+    # Older rows store "Yes"/"No", newer ones 1/0
+    for c in YES_NO_COLUMNS:
+        if c in df.columns:
+            df[c] = df[c].astype(str).isin(["Yes", "1"]).astype(np.int8)
+    return df
+
+def write_log(df):
+    """Serialize the log into an in-memory buffer of the bytes stored on GitHub."""
+    buf = io.BytesIO()
+    if USE_PARQUET:
+        df.to_parquet(buf, compression="zstd", index=False)
+    else:
+        df.to_csv(buf, index=False)
+    return buf
+
+# --------------------
+# GitHub API helpers
+# --------------------
+def get_file_sha():
+    url = f"https://api.github.com/repos/{REPO_OWNER}/{REPO_NAME}/contents/{FILE_PATH}"
+    resp = SESSION.get(url, params={"ref": BRANCH})
+    if resp.status_code == 200:
+        return resp.json()["sha"]
+    return None
+
+def upload_to_github(df, sha=None, commit_message=f"Update {FILE_PATH}"):
+    """PUT ``df`` to GitHub and return the new file SHA, or None on failure.
+
+    Runs on the upload thread, so it must not touch ``st`` state.
+    """
+    # Encode straight from the buffer's memoryview to avoid extra copies
+    content_encoded = base64.b64encode(write_log(df).getbuffer()).decode("ascii")
+    # Reuse the SHA returned by our last PUT instead of re-fetching it
+    sha = sha or get_file_sha()
+    if not sha:
+        return None
+
+    url = f"https://api.github.com/repos/{REPO_OWNER}/{REPO_NAME}/contents/{FILE_PATH}"
+    data = {
+        "message": commit_message,
+        "content": content_encoded,
+        "sha": sha,
+        "branch": BRANCH
+    }
+    response = SESSION.put(url, json=data)
+    if response.status_code == 409:
+        # Our cached SHA is stale (file changed elsewhere) - refetch once and retry
+        data["sha"] = get_file_sha()
+        if data["sha"]:
+            response = SESSION.put(url, json=data)
+    if response.status_code in [200, 201]:
+        return response.json()["content"]["sha"]
+    return None
+
+@st.cache_resource(show_spinner=False)
+def get_upload_executor():
+    # A single worker keeps uploads ordered: each PUT carries the whole file
+    return ThreadPoolExecutor(max_workers=1)
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_data():
+    url = f"https://api.github.com/repos/{REPO_OWNER}/{REPO_NAME}/contents/{FILE_PATH}"
+    headers = {"Accept": "application/vnd.github.raw", "Accept-Encoding": "gzip"}
+    try:
+        resp = SESSION.get(url, headers=headers, params={"ref": BRANCH}, timeout=10)
+        resp.raise_for_status()
+        # Weekday is derived from Date for display; older files still store it
+        df = read_log(resp.content).drop(columns="Weekday", errors="ignore")
+        df = apply_dtypes(df)
+        # Everything downstream relies on the log being sorted by Date
+        return df.sort_values("Date", kind="stable", ignore_index=True)
+    except Exception:
+        return pd.DataFrame(columns=COLUMNS)
+
+def merge_entries(df, rows):
+    """Return ``df`` with ``rows`` added, keeping it sorted by Date.
+
+    Each new row is slotted in at its searchsorted position (after any
+    existing rows for the same day) rather than re-sorting the whole log.
+    """
+    new = apply_dtypes(pd.DataFrame(rows)).sort_values("Date", kind="stable")
+    positions = df["Date"].searchsorted(new["Date"], side="right")
+    pieces, prev = [], 0
+    for i, pos in enumerate(positions):
+        pieces += [df.iloc[prev:pos], new.iloc[i:i + 1]]
+        prev = pos
+    pieces.append(df.iloc[prev:])
+    return pd.concat(pieces, ignore_index=True)
+
+def sync_pending():
+    """Start uploading the log plus all buffered entries in the background.
+
+    Pending rows stay buffered until the upload is confirmed by
+    ``collect_upload``, so a failed upload loses nothing.
+    """
+    if st.session_state.upload is not None:
+        return
+    pending = st.session_state.pending_rows
+    merged = merge_entries(st.session_state.df, pending)
+    future = get_upload_executor().submit(
+        upload_to_github, merged, st.session_state.get("csv_sha"),
+        commit_message=f"Add {len(pending)} entries to {FILE_PATH}"
+    )
+    st.session_state.upload = (future, merged, len(pending))
+
+def collect_upload():
+    """Apply the result of a finished background upload, if there is one."""
+    if st.session_state.upload is None or not st.session_state.upload[0].done():
+        return
+    future, merged, count = st.session_state.upload
+    st.session_state.upload = None
+    sha = future.result()
+    if not sha:
+        st.toast("❌ Failed to save entries to GitHub.")
+        return
+    st.session_state["csv_sha"] = sha
+    st.session_state.df = merged
+    st.session_state.pending_rows = st.session_state.pending_rows[count:]
+    load_data.clear()
+    st.toast(f"✅ {count} entries saved to GitHub!")
+
+# --------------------
+# Plot helpers
+# --------------------
+@st.cache_data(show_spinner=False)
+def build_line(dates, values, title):
+    # Plotly is imported lazily: it is slow to import and unused on an empty log
+    import plotly.graph_objects as go
+
+    fig = go.Figure(go.Scatter(x=dates, y=values, mode='lines+markers'))
+    fig.update_layout(title=title, xaxis_title="Date", yaxis_title="Hours")
+    return fig
+
+# --------------------
+# Init session state
+# --------------------
+if "df" not in st.session_state:
+    st.session_state.df = load_data()
+if "pending_rows" not in st.session_state:
+    st.session_state.pending_rows = []
+if "upload" not in st.session_state:
+    st.session_state.upload = None
+
+# --------------------
+# UI
+# --------------------
+st.set_page_config(page_title="Daily Log", layout="wide")
+st.title("📊 Daily Log Tracker")
+
+collect_upload()
+
+if st.button("🔄 Refresh"):
+    load_data.clear()
+    st.session_state.df = load_data()
+
+st.subheader("📝 Add New Entry")
+
+with st.form("log_form", clear_on_submit=True):
+    entry_date = st.date_input("Date", value=date.today())
+    
+    # Time inputs
+    screen_time_t = st.time_input("Screen Time (HH:MM)", value=datetime.strptime("00:00", "%H:%M").time())
+    study_time_t = st.time_input("Study Time (HH:MM)", value=datetime.strptime("00:00", "%H:%M").time())
+    wakeup_time = st.time_input("Morning Wake Up Hour", value=datetime.strptime("08:00", "%H:%M").time())
+
+    def time_to_decimal(t):
+        return round(t.hour + t.minute / 60, 2)
+
+    screen_time = time_to_decimal(screen_time_t)
+    study_time = time_to_decimal(study_time_t)
+    wakeup_decimal = time_to_decimal(wakeup_time)
+
+    entry = {
+        "Date": pd.to_datetime(entry_date),
+        "Ordinary Day": int(st.selectbox("Ordinary Day", YES_NO) == "Yes"),
+        "Screen Time": screen_time,
+        "Study Time": study_time,
+        "Study Quality (1-10)": st.slider("Study Quality", 1, 10),
+        "Meditation": int(st.selectbox("Meditation", YES_NO) == "Yes"),
+        "Morning Study": int(st.selectbox("Morning Study", YES_NO) == "Yes"),
+        "Morning Phone": int(st.selectbox("Morning Phone", YES_NO) == "Yes"),
+        "Lunch Phone": int(st.selectbox("Lunch Phone", YES_NO) == "Yes"),
+        "Dinner Phone": int(st.selectbox("Dinner Phone", YES_NO) == "Yes"),
+        "Running": int(st.selectbox("Running", YES_NO) == "Yes"),
+        "P": int(st.selectbox("P", YES_NO) == "Yes"),
+        "Morning Wake Up Hour": wakeup_decimal,
+        "Notes": st.text_area("Notes"),
+        "Plan/Strategies": st.text_area("Plan/Strategies")
+    }
+
+    submitted = st.form_submit_button("Add Entry")
+
+if submitted:
+    st.session_state.pending_rows.append(entry)
+    if len(st.session_state.pending_rows) >= SYNC_THRESHOLD:
+        sync_pending()
+    st.info(f"📝 Entry for {entry['Date'].date()} added.")
+
+pending_count = len(st.session_state.pending_rows)
+if st.session_state.upload is not None:
+    st.caption("☁️ Saving to GitHub…")
+elif pending_count and st.button(f"☁️ Sync {pending_count} pending entries to GitHub"):
+    sync_pending()
+    st.caption("☁️ Saving to GitHub…")
+
+# --------------------
+# Analysis + Plots
+# --------------------
+df = st.session_state.df
+if st.session_state.pending_rows:
+    df = merge_entries(df, st.session_state.pending_rows)
+
+# Date filter
+col1, col2 = st.columns(2)
+with col1:
+    start_date = st.date_input("Start Date", df["Date"].min() if not df.empty else date.today())
+with col2:
+    end_date = st.date_input("End Date", df["Date"].max() if not df.empty else date.today())
+
+# df is sorted by Date, so the range is a contiguous slice
+lo = df["Date"].searchsorted(pd.Timestamp(start_date), side="left")
+hi = df["Date"].searchsorted(pd.Timestamp(end_date), side="right")
+filtered_df = df.iloc[lo:hi]
+
+# Recent Logs
+st.subheader("🕒 Recent Logs")
+if not df.empty:
+    # df is kept sorted by Date, so the newest rows are simply the last ones
+    recent = df.iloc[-3:][::-1].copy()
+    recent.insert(1, "Weekday", pd.to_datetime(recent["Date"]).dt.day_name())
+    st.dataframe(recent, use_container_width=True)
+else:
+    st.info("No entries yet!")
+
+# Line Charts
+if not filtered_df.empty:
+    st.subheader("📈 Time-Based Charts")
+    with col1:
+        fig1 = build_line(filtered_df["Date"].values, filtered_df["Screen Time"].values, "Screen Time")
+        st.plotly_chart(fig1, use_container_width=True)
+
+    with col2:
+        fig2 = build_line(filtered_df["Date"].values, filtered_df["Study Time"].values, "Study Time")
+        st.plotly_chart(fig2, use_container_width=True)
+
+# Correlation Heatmap
+if len(filtered_df) > 1:
+    st.subheader("🔍 Correlation Heatmap")
+    numeric_df = filtered_df.select_dtypes(include='number')
+    arr = numeric_df.to_numpy(dtype=np.float32, copy=False)
+    arr = arr[~np.isnan(arr).any(axis=1)]  # drop incomplete rows once
+    if numeric_df.shape[1] and len(arr) > 1:
+        import plotly.figure_factory as ff
+
+        cols = numeric_df.columns.tolist()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = np.atleast_2d(np.corrcoef(arr, rowvar=False))
+        heatmap = ff.create_annotated_heatmap(
+            z=corr,
+            x=cols,
+            y=cols,
+            colorscale='RdBu',
+            showscale=True
+        )
+        heatmap.update_layout(title="Numerical Correlation Heatmap")
+        st.plotly_chart(heatmap, use_container_width=True)
+    else:
+        st.info("No numeric data to show correlation.")